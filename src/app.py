@@ -19,61 +19,61 @@ current_dir = Path(__file__).parent
 app.mount("/static", StaticFiles(directory=os.path.join(Path(__file__).parent,
           "static")), name="static")
 
-# In-memory activity database
+# In-memory activity database (participants are sets for O(1) membership checks)
 activities = {
     "Chess Club": {
         "description": "Learn strategies and compete in chess tournaments",
         "schedule": "Fridays, 3:30 PM - 5:00 PM",
         "max_participants": 12,
-        "participants": ["michael@mergington.edu", "daniel@mergington.edu"]
+        "participants": {"michael@mergington.edu", "daniel@mergington.edu"}
     },
     "Programming Class": {
         "description": "Learn programming fundamentals and build software projects",
         "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
         "max_participants": 20,
-        "participants": ["emma@mergington.edu", "sophia@mergington.edu"]
+        "participants": {"emma@mergington.edu", "sophia@mergington.edu"}
     },
     "Gym Class": {
         "description": "Physical education and sports activities",
         "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
         "max_participants": 30,
-        "participants": ["john@mergington.edu", "olivia@mergington.edu"]
+        "participants": {"john@mergington.edu", "olivia@mergington.edu"}
     },
     "Soccer Team": {
         "description": "Join the varsity soccer team for training and matches",
         "schedule": "Mondays and Wednesdays, 4:00 PM - 6:00 PM",
         "max_participants": 25,
-        "participants": ["alex@mergington.edu"]
+        "participants": {"alex@mergington.edu"}
     },
     "Swimming Club": {
         "description": "Swim laps and compete in swim meets",
         "schedule": "Tuesdays and Thursdays, 4:00 PM - 5:30 PM",
         "max_participants": 20,
-        "participants": ["sarah@mergington.edu", "james@mergington.edu"]
+        "participants": {"sarah@mergington.edu", "james@mergington.edu"}
     },
     "Art Club": {
         "description": "Explore various art mediums including painting and sculpture",
         "schedule": "Wednesdays, 3:30 PM - 5:00 PM",
         "max_participants": 15,
-        "participants": ["lily@mergington.edu"]
+        "participants": {"lily@mergington.edu"}
     },
     "Drama Club": {
         "description": "Participate in theatrical productions and improve acting skills",
         "schedule": "Thursdays, 3:30 PM - 5:30 PM",
         "max_participants": 25,
-        "participants": ["noah@mergington.edu", "ava@mergington.edu"]
+        "participants": {"noah@mergington.edu", "ava@mergington.edu"}
     },
     "Debate Team": {
         "description": "Develop critical thinking and public speaking through competitive debates",
         "schedule": "Tuesdays, 3:30 PM - 5:00 PM",
         "max_participants": 16,
-        "participants": ["ethan@mergington.edu"]
+        "participants": {"ethan@mergington.edu"}
     },
     "Science Olympiad": {
         "description": "Compete in science competitions and conduct experiments",
         "schedule": "Fridays, 4:00 PM - 6:00 PM",
         "max_participants": 18,
-        "participants": ["mia@mergington.edu", "liam@mergington.edu"]
+        "participants": {"mia@mergington.edu", "liam@mergington.edu"}
     }
 }
 
@@ -85,7 +85,11 @@ def root():
 
 @app.get("/activities")
 def get_activities():
-    return activities
+    # Participants are stored as sets; expose them as sorted lists
+    return {
+        name: {**details, "participants": sorted(details["participants"])}
+        for name, details in activities.items()
+    }
 
 
 @app.post("/activities/{activity_name}/signup")
@@ -107,7 +111,7 @@ def signup_for_activity(activity_name: str, email: str):
         raise HTTPException(status_code=400, detail="Activity is full")
 
     # Add student
-    activity["participants"].append(email)
+    activity["participants"].add(email)
     return {"message": f"Signed up {email} for {activity_name}"}
 
 
@@ -4,113 +4,164 @@ Tests for the Mergington High School Activities API
 Tests all endpoints including GET activities, POST signup, and DELETE unregister.
 """
 
+import pickle
+from urllib.parse import quote
+
+import httpx
+import msgspec
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
-from src.app import app, activities
+from src.app import app, activities, signup_for_activity
 
 
-@pytest.fixture
+def _activity_url(activity_name, action):
+    """Build the URL-encoded path for an activity action, e.g. signup or unregister"""
+    return f"/activities/{quote(activity_name)}/{action}"
+
+
+def _signup(activity_name, email):
+    """Sign up by calling the route handler directly, bypassing the HTTP stack"""
+    return signup_for_activity(activity_name, email)
+
+
+CHESS_SIGNUP = _activity_url("Chess Club", "signup")
+CHESS_UNREGISTER = _activity_url("Chess Club", "unregister")
+SOCCER_SIGNUP = _activity_url("Soccer Team", "signup")
+SOCCER_UNREGISTER = _activity_url("Soccer Team", "unregister")
+
+
+class Activity(msgspec.Struct):
+    """Expected structure of each activity returned by GET /activities"""
+    description: str
+    schedule: str
+    max_participants: int
+    participants: list[str]
+
+
+# Pristine activities data; tests never mutate this directly
+_ORIGINAL_ACTIVITIES = {
+    "Chess Club": {
+        "description": "Learn strategies and compete in chess tournaments",
+        "schedule": "Fridays, 3:30 PM - 5:00 PM",
+        "max_participants": 12,
+        "participants": {"michael@mergington.edu", "daniel@mergington.edu"}
+    },
+    "Programming Class": {
+        "description": "Learn programming fundamentals and build software projects",
+        "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
+        "max_participants": 20,
+        "participants": {"emma@mergington.edu", "sophia@mergington.edu"}
+    },
+    "Gym Class": {
+        "description": "Physical education and sports activities",
+        "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
+        "max_participants": 30,
+        "participants": {"john@mergington.edu", "olivia@mergington.edu"}
+    },
+    "Soccer Team": {
+        "description": "Join the varsity soccer team for training and matches",
+        "schedule": "Mondays and Wednesdays, 4:00 PM - 6:00 PM",
+        "max_participants": 25,
+        "participants": {"alex@mergington.edu"}
+    },
+    "Swimming Club": {
+        "description": "Swim laps and compete in swim meets",
+        "schedule": "Tuesdays and Thursdays, 4:00 PM - 5:30 PM",
+        "max_participants": 20,
+        "participants": {"sarah@mergington.edu", "james@mergington.edu"}
+    },
+    "Art Club": {
+        "description": "Explore various art mediums including painting and sculpture",
+        "schedule": "Wednesdays, 3:30 PM - 5:00 PM",
+        "max_participants": 15,
+        "participants": {"lily@mergington.edu"}
+    },
+    "Drama Club": {
+        "description": "Participate in theatrical productions and improve acting skills",
+        "schedule": "Thursdays, 3:30 PM - 5:30 PM",
+        "max_participants": 25,
+        "participants": {"noah@mergington.edu", "ava@mergington.edu"}
+    },
+    "Debate Team": {
+        "description": "Develop critical thinking and public speaking through competitive debates",
+        "schedule": "Tuesdays, 3:30 PM - 5:00 PM",
+        "max_participants": 16,
+        "participants": {"ethan@mergington.edu"}
+    },
+    "Science Olympiad": {
+        "description": "Compete in science competitions and conduct experiments",
+        "schedule": "Fridays, 4:00 PM - 6:00 PM",
+        "max_participants": 18,
+        "participants": {"mia@mergington.edu", "liam@mergington.edu"}
+    }
+}
+
+# Filler student emails, enough to fill any activity
+_STUDENT_EMAILS = tuple(
+    f"student{i}@mergington.edu"
+    for i in range(max(a["max_participants"] for a in _ORIGINAL_ACTIVITIES.values()))
+)
+
+
+@pytest.fixture(scope="session")
 def client():
-    """Create a test client for the FastAPI app"""
+    """Create a single test client shared across the test session"""
     return TestClient(app)
 
 
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def async_client():
+    """Create a single async client that calls the app in-process over ASGI"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warmup(client):
+    """Hit every endpoint once to warm up the client transport and first dispatch"""
+    assert client.get("/activities").status_code == 200
+    assert client.post(f"{CHESS_SIGNUP}?email=warmup@mergington.edu").status_code == 200
+    assert client.delete(f"{CHESS_UNREGISTER}?email=warmup@mergington.edu").status_code == 200
+
+
+@pytest.fixture(scope="session")
+def _pickled_activities():
+    """Build the pristine activities snapshot once per test session, pickled"""
+    return pickle.dumps(_ORIGINAL_ACTIVITIES, protocol=pickle.HIGHEST_PROTOCOL)
+
+
 @pytest.fixture(autouse=True)
-def reset_activities():
+def reset_activities(_pickled_activities):
     """Reset activities data before each test"""
-    # Store original state
-    original_activities = {
-        "Chess Club": {
-            "description": "Learn strategies and compete in chess tournaments",
-            "schedule": "Fridays, 3:30 PM - 5:00 PM",
-            "max_participants": 12,
-            "participants": ["michael@mergington.edu", "daniel@mergington.edu"]
-        },
-        "Programming Class": {
-            "description": "Learn programming fundamentals and build software projects",
-            "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
-            "max_participants": 20,
-            "participants": ["emma@mergington.edu", "sophia@mergington.edu"]
-        },
-        "Gym Class": {
-            "description": "Physical education and sports activities",
-            "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
-            "max_participants": 30,
-            "participants": ["john@mergington.edu", "olivia@mergington.edu"]
-        },
-        "Soccer Team": {
-            "description": "Join the varsity soccer team for training and matches",
-            "schedule": "Mondays and Wednesdays, 4:00 PM - 6:00 PM",
-            "max_participants": 25,
-            "participants": ["alex@mergington.edu"]
-        },
-        "Swimming Club": {
-            "description": "Swim laps and compete in swim meets",
-            "schedule": "Tuesdays and Thursdays, 4:00 PM - 5:30 PM",
-            "max_participants": 20,
-            "participants": ["sarah@mergington.edu", "james@mergington.edu"]
-        },
-        "Art Club": {
-            "description": "Explore various art mediums including painting and sculpture",
-            "schedule": "Wednesdays, 3:30 PM - 5:00 PM",
-            "max_participants": 15,
-            "participants": ["lily@mergington.edu"]
-        },
-        "Drama Club": {
-            "description": "Participate in theatrical productions and improve acting skills",
-            "schedule": "Thursdays, 3:30 PM - 5:30 PM",
-            "max_participants": 25,
-            "participants": ["noah@mergington.edu", "ava@mergington.edu"]
-        },
-        "Debate Team": {
-            "description": "Develop critical thinking and public speaking through competitive debates",
-            "schedule": "Tuesdays, 3:30 PM - 5:00 PM",
-            "max_participants": 16,
-            "participants": ["ethan@mergington.edu"]
-        },
-        "Science Olympiad": {
-            "description": "Compete in science competitions and conduct experiments",
-            "schedule": "Fridays, 4:00 PM - 6:00 PM",
-            "max_participants": 18,
-            "participants": ["mia@mergington.edu", "liam@mergington.edu"]
-        }
-    }
-    
-    # Reset to original state before each test
-    activities.clear()
-    activities.update(original_activities)
-    
-    yield
-    
-    # Cleanup after test (optional)
+    # Unpickling gives a fresh deep copy without deepcopy's Python-level recursion
     activities.clear()
-    activities.update(original_activities)
+    activities.update(pickle.loads(_pickled_activities))
+
+
+@pytest.fixture
+def nearly_full(request):
+    """Fill the parametrized activity to one spot below capacity"""
+    name = request.param
+    activity = activities[name]
+    activity["participants"] = set(_STUDENT_EMAILS[:activity["max_participants"] - 1])
+    return name
 
 
 class TestGetActivities:
     """Tests for GET /activities endpoint"""
     
     def test_get_all_activities(self, client):
-        """Test retrieving all activities"""
+        """Test retrieving all activities and their structure"""
         response = client.get("/activities")
         assert response.status_code == 200
         
-        data = response.json()
-        assert len(data) == 9
+        # Decoding raises if any activity doesn't match the expected structure
+        data = msgspec.json.decode(response.content, type=dict[str, Activity])
+        assert len(data) == len(_ORIGINAL_ACTIVITIES)
         assert "Chess Club" in data
         assert "Programming Class" in data
-        
-    def test_activities_structure(self, client):
-        """Test that each activity has the correct structure"""
-        response = client.get("/activities")
-        data = response.json()
-        
-        for activity_name, activity_data in data.items():
-            assert "description" in activity_data
-            assert "schedule" in activity_data
-            assert "max_participants" in activity_data
-            assert "participants" in activity_data
-            assert isinstance(activity_data["participants"], list)
 
 
 class TestSignupForActivity:
@@ -119,51 +170,27 @@ class TestSignupForActivity:
     def test_successful_signup(self, client):
         """Test successfully signing up for an activity"""
         response = client.post(
-            "/activities/Chess Club/signup?email=test@mergington.edu"
+            f"{CHESS_SIGNUP}?email=test@mergington.edu"
         )
         assert response.status_code == 200
         assert response.json()["message"] == "Signed up test@mergington.edu for Chess Club"
         
         # Verify the participant was added
-        activities_response = client.get("/activities")
-        assert "test@mergington.edu" in activities_response.json()["Chess Club"]["participants"]
-    
-    def test_signup_for_nonexistent_activity(self, client):
-        """Test signing up for an activity that doesn't exist"""
-        response = client.post(
-            "/activities/Nonexistent Club/signup?email=test@mergington.edu"
-        )
-        assert response.status_code == 404
-        assert response.json()["detail"] == "Activity not found"
+        assert "test@mergington.edu" in activities["Chess Club"]["participants"]
     
-    def test_duplicate_signup(self, client):
-        """Test that a student cannot sign up twice for the same activity"""
-        email = "duplicate@mergington.edu"
-        
-        # First signup should succeed
-        response1 = client.post(f"/activities/Chess Club/signup?email={email}")
-        assert response1.status_code == 200
-        
-        # Second signup should fail
-        response2 = client.post(f"/activities/Chess Club/signup?email={email}")
-        assert response2.status_code == 400
-        assert "already signed up" in response2.json()["detail"].lower()
-    
-    def test_signup_for_full_activity(self, client):
+    @pytest.mark.parametrize("nearly_full", ["Chess Club"], indirect=True)
+    def test_signup_for_full_activity(self, client, nearly_full):
         """Test signing up for an activity that is already full"""
-        # Fill up Chess Club (max 12 participants)
-        current_participants = len(activities["Chess Club"]["participants"])
-        spots_left = activities["Chess Club"]["max_participants"] - current_participants
+        signup_url = _activity_url(nearly_full, "signup")
         
-        # Add participants until full
-        for i in range(spots_left):
-            response = client.post(f"/activities/Chess Club/signup?email=student{i}@mergington.edu")
-            assert response.status_code == 200
+        # Take the last spot
+        response = client.post(f"{signup_url}?email=last@mergington.edu")
+        assert response.status_code == 200
         
         # Next signup should fail
-        response = client.post("/activities/Chess Club/signup?email=overflow@mergington.edu")
+        response = client.post(f"{signup_url}?email=overflow@mergington.edu")
         assert response.status_code == 400
-        assert "full" in response.json()["detail"].lower()
+        assert response.json()["detail"] == "Activity is full"
 
 
 class TestUnregisterFromActivity:
@@ -177,53 +204,68 @@ class TestUnregisterFromActivity:
         assert email in activities["Chess Club"]["participants"]
         
         # Unregister
-        response = client.delete(f"/activities/Chess Club/unregister?email={email}")
+        response = client.delete(f"{CHESS_UNREGISTER}?email={email}")
         assert response.status_code == 200
         assert response.json()["message"] == f"Unregistered {email} from Chess Club"
         
         # Verify participant was removed
         assert email not in activities["Chess Club"]["participants"]
     
-    def test_unregister_nonexistent_activity(self, client):
-        """Test unregistering from an activity that doesn't exist"""
-        response = client.delete(
-            "/activities/Nonexistent Club/unregister?email=test@mergington.edu"
-        )
-        assert response.status_code == 404
-        assert response.json()["detail"] == "Activity not found"
-    
-    def test_unregister_not_registered_student(self, client):
-        """Test unregistering a student who is not registered"""
-        email = "notregistered@mergington.edu"
-        
-        response = client.delete(f"/activities/Chess Club/unregister?email={email}")
-        assert response.status_code == 404
-        assert "not registered" in response.json()["detail"].lower()
-    
     def test_unregister_and_signup_again(self, client):
         """Test that a student can unregister and then sign up again"""
         email = "flexible@mergington.edu"
         
         # Sign up
-        response1 = client.post(f"/activities/Soccer Team/signup?email={email}")
+        response1 = client.post(f"{SOCCER_SIGNUP}?email={email}")
         assert response1.status_code == 200
         
         # Unregister
-        response2 = client.delete(f"/activities/Soccer Team/unregister?email={email}")
+        response2 = client.delete(f"{SOCCER_UNREGISTER}?email={email}")
         assert response2.status_code == 200
         
         # Sign up again
-        response3 = client.post(f"/activities/Soccer Team/signup?email={email}")
+        response3 = client.post(f"{SOCCER_SIGNUP}?email={email}")
         assert response3.status_code == 200
         
-        # Verify participant is in the list once
-        assert activities["Soccer Team"]["participants"].count(email) == 1
+        # Verify participant is registered
+        assert email in activities["Soccer Team"]["participants"]
 
 
+class TestErrorResponses:
+    """Tests for requests rejected by the signup and unregister endpoints"""
+    
+    def test_rejected_requests(self, client, subtests):
+        """Test signup and unregister requests that should be rejected"""
+        # Sign up directly so the HTTP signup below is a duplicate
+        _signup("Chess Club", "duplicate@mergington.edu")
+        
+        cases = [
+            ("signup for nonexistent activity", "POST",
+             f"{_activity_url('Nonexistent Club', 'signup')}?email=test@mergington.edu",
+             404, "Activity not found"),
+            ("unregister from nonexistent activity", "DELETE",
+             f"{_activity_url('Nonexistent Club', 'unregister')}?email=test@mergington.edu",
+             404, "Activity not found"),
+            ("duplicate signup", "POST",
+             f"{CHESS_SIGNUP}?email=duplicate@mergington.edu",
+             400, "Student already signed up for this activity"),
+            ("student not registered", "DELETE",
+             f"{CHESS_UNREGISTER}?email=notregistered@mergington.edu",
+             404, "Student is not registered for this activity"),
+        ]
+        
+        for name, method, path, status_code, detail in cases:
+            with subtests.test(name):
+                response = client.request(method, path)
+                assert response.status_code == status_code
+                assert response.json()["detail"] == detail
+
+
+@pytest.mark.asyncio(loop_scope="session")
 class TestIntegrationScenarios:
     """Integration tests for realistic user scenarios"""
     
-    def test_student_joins_multiple_activities(self, client):
+    async def test_student_joins_multiple_activities(self, async_client):
         """Test a student joining multiple different activities"""
         email = "busy@mergington.edu"
         
@@ -231,34 +273,32 @@ class TestIntegrationScenarios:
         activities_to_join = ["Chess Club", "Programming Class", "Art Club"]
         
         for activity in activities_to_join:
-            response = client.post(f"/activities/{activity}/signup?email={email}")
+            response = await async_client.post(f"{_activity_url(activity, 'signup')}?email={email}")
             assert response.status_code == 200
         
         # Verify student is in all activities
-        all_activities = client.get("/activities").json()
+        all_activities = (await async_client.get("/activities")).json()
         for activity in activities_to_join:
             assert email in all_activities[activity]["participants"]
     
-    def test_activity_capacity_management(self, client):
+    @pytest.mark.parametrize("nearly_full", ["Debate Team"], indirect=True)
+    async def test_activity_capacity_management(self, async_client, nearly_full):
         """Test that activity capacity is properly managed"""
-        activity = "Debate Team"
+        activity = nearly_full
         max_capacity = activities[activity]["max_participants"]
-        current_count = len(activities[activity]["participants"])
-        available_spots = max_capacity - current_count
+        signup_url = _activity_url(activity, "signup")
         
-        # Fill remaining spots
-        for i in range(available_spots):
-            response = client.post(
-                f"/activities/{activity}/signup?email=student{i}@mergington.edu"
-            )
-            assert response.status_code == 200
+        # Fill the remaining spot
+        response = await async_client.post(
+            f"{signup_url}?email=last@mergington.edu"
+        )
+        assert response.status_code == 200
         
         # Verify activity is full
-        all_activities = client.get("/activities").json()
-        assert len(all_activities[activity]["participants"]) == max_capacity
+        assert len(activities[activity]["participants"]) == max_capacity
         
         # Try to add one more (should fail)
-        response = client.post(
-            f"/activities/{activity}/signup?email=overflow@mergington.edu"
+        response = await async_client.post(
+            f"{signup_url}?email=overflow@mergington.edu"
         )
         assert response.status_code == 400